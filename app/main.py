@@ -9,38 +9,43 @@ endpoints intact and add your own routes in a separate router file.
 """
 
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 import os
 import socket
 import time
 import datetime
+import hashlib
+import html
 import logging
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
-logger = logging.getLogger("uvicorn.error")
+import orjson
 
-# Thread pool for K8s API calls — prevents blocking the uvicorn event loop
-_k8s_executor = ThreadPoolExecutor(max_workers=1)
+logger = logging.getLogger("uvicorn.error")
 
 # ---------------------------------------------------------------------------
 # Kubernetes API client — for peer pod discovery
 # ---------------------------------------------------------------------------
+# kubernetes_asyncio runs API calls natively on the uvicorn event loop (aiohttp),
+# so concurrent requests overlap instead of queueing behind a worker thread.
+# The client itself is created in the startup hook below.
 try:
-    from kubernetes import client, config
-    config.load_incluster_config()
-    k8s_v1 = client.CoreV1Api()
-    K8S_AVAILABLE = True
-    logger.info("Kubernetes in-cluster config loaded — peer discovery enabled")
-except Exception:
-    k8s_v1 = None
-    K8S_AVAILABLE = False
-    logger.warning("Kubernetes client not available — peer discovery disabled")
+    from kubernetes_asyncio import client, config, watch
+    from kubernetes_asyncio.client.exceptions import ApiException
+    K8S_CLIENT_INSTALLED = True
+except ImportError:
+    K8S_CLIENT_INSTALLED = False
+
+k8s_api_client = None
+k8s_v1 = None
+K8S_AVAILABLE = False
+_peer_watch_task = None
 
 # ---------------------------------------------------------------------------
 # App state — simulates real-world readiness conditions
 # ---------------------------------------------------------------------------
-APP_START_TIME = time.time()
+APP_START_MONO = time.monotonic()  # monotonic: immune to NTP steps and wall-clock jumps
 READY = False
 HEALTHY = True
 STARTUP_DELAY = int(os.getenv("STARTUP_DELAY", "5"))  # seconds before "ready"
@@ -48,6 +53,15 @@ POD_NAME = os.getenv("HOSTNAME", "unknown-pod")
 NAMESPACE = os.getenv("POD_NAMESPACE", "default")
 NODE_NAME = os.getenv("NODE_NAME", "unknown-node")
 APP_VERSION = os.getenv("APP_VERSION", "1.0.0")
+_startup_done = asyncio.Event()  # set once, STARTUP_DELAY seconds after start
+
+# The pod's hostname and IP never change during its lifetime — resolve once
+# instead of going through libc/nsswitch on every request.
+MY_HOSTNAME = socket.gethostname()
+try:
+    MY_IP = socket.gethostbyname(MY_HOSTNAME)
+except OSError:
+    MY_IP = "unknown"
 
 app = FastAPI(
     title="EKS Probe Demo",
@@ -56,106 +70,276 @@ app = FastAPI(
 )
 
 
+def _mark_ready():
+    """Startup delay elapsed — flip readiness once instead of on every probe."""
+    global READY
+    READY = True
+    _startup_done.set()
+
+
+@app.on_event("startup")
+async def _schedule_ready():
+    """Schedule the simulated startup delay to end STARTUP_DELAY seconds after start."""
+    remaining = STARTUP_DELAY - (time.monotonic() - APP_START_MONO)
+    asyncio.get_running_loop().call_later(max(remaining, 0), _mark_ready)
+
+
+@app.on_event("startup")
+async def _open_k8s_client():
+    """Load in-cluster config and open a shared API client for peer discovery."""
+    global k8s_api_client, k8s_v1, K8S_AVAILABLE, _peer_watch_task
+    if not K8S_CLIENT_INSTALLED:
+        logger.warning("Kubernetes client not available — peer discovery disabled")
+        return
+    try:
+        config.load_incluster_config()
+        k8s_api_client = client.ApiClient()
+        k8s_v1 = client.CoreV1Api(k8s_api_client)
+        K8S_AVAILABLE = True
+        _peer_watch_task = asyncio.create_task(_watch_peer_pods())
+        logger.info("Kubernetes in-cluster config loaded — peer discovery enabled")
+    except Exception:
+        logger.warning("Kubernetes client not available — peer discovery disabled")
+
+
+@app.on_event("shutdown")
+async def _close_k8s_client():
+    """Stop the peer watch and close the shared API client's connection pool."""
+    global k8s_v1, K8S_AVAILABLE
+    K8S_AVAILABLE = False
+    if _peer_watch_task is not None:
+        _peer_watch_task.cancel()
+        try:
+            await _peer_watch_task
+        except asyncio.CancelledError:
+            pass
+    k8s_v1 = None
+    if k8s_api_client is not None:
+        await k8s_api_client.close()
+
+
 # ---------------------------------------------------------------------------
 # Peer discovery — DNS-based (headless Service) + K8s API fallback
 # ---------------------------------------------------------------------------
 HEADLESS_SVC = os.getenv("HEADLESS_SVC", "demo-headless")
 SERVICE_NAME = os.getenv("SERVICE_NAME", "demo-service")
+# Trailing dot marks the name as fully qualified, so glibc doesn't walk the
+# resolv.conf search domains (ndots:5) before trying it as-is.
+HEADLESS_DNS_NAME = f"{HEADLESS_SVC}.{NAMESPACE}.svc.cluster.local."
+DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", "5"))
+_dns_cache = {"expires": 0.0, "value": []}
+
+# Peer results are cached in-process so bursts of page loads collapse into a
+# single upstream lookup. Empty results (discovery failed) expire sooner.
+PEER_CACHE_TTL = float(os.getenv("PEER_CACHE_TTL", "5"))
+PEER_CACHE_NEGATIVE_TTL = float(os.getenv("PEER_CACHE_NEGATIVE_TTL", "1"))
+_peer_cache = {"ts": 0.0, "data": [], "version": 0}  # version bumps when peers change
+_peer_lock = asyncio.Lock()
+
+# Pod snapshot maintained by a background watch (shared-informer style), keyed
+# by pod name. Request handlers only read it — no API call per page load.
+PEER_LABEL_SELECTOR = "app=demo"
+PEER_FIELD_SELECTOR = "status.phase!=Failed,status.phase!=Succeeded"  # skip finished pods
+PEER_WATCH_TIMEOUT = 300  # seconds before the API server ends a watch; we reconnect
+_peer_state = {}
+_peer_state_synced = False
 
 
-def _discover_via_dns():
+async def _discover_via_dns():
     """
     Resolve the headless Service DNS name to get all pod IPs.
     No RBAC or API server access needed — just standard cluster DNS.
+    Results are cached for DNS_CACHE_TTL seconds.
     """
-    dns_name = f"{HEADLESS_SVC}.{NAMESPACE}.svc.cluster.local"
-    my_ip = socket.gethostbyname(socket.gethostname())
+    if time.monotonic() < _dns_cache["expires"]:
+        return _dns_cache["value"]
     try:
-        results = socket.getaddrinfo(dns_name, 8000, socket.AF_INET, socket.SOCK_STREAM)
-        seen = set()
-        peers = []
+        loop = asyncio.get_running_loop()
+        # Numeric port + IPv4/TCP only: no service-name lookup, one result per address
+        results = await loop.getaddrinfo(
+            HEADLESS_DNS_NAME, 8000,
+            family=socket.AF_INET, type=socket.SOCK_STREAM, proto=socket.IPPROTO_TCP,
+            flags=socket.AI_NUMERICSERV | socket.AI_ADDRCONFIG,
+        )
+        by_ip = {}
         for _, _, _, _, (ip, _) in results:
-            if ip in seen:
+            if ip in by_ip:
                 continue
-            seen.add(ip)
-            peers.append({
+            by_ip[ip] = {
                 "name": ip,  # DNS only gives IPs, not pod names
                 "ip": ip,
                 "node": "—",
                 "phase": "Running",
                 "ready": True,  # only ready pods appear in DNS
                 "restarts": 0,
-                "is_self": ip == my_ip,
-            })
-        return sorted(peers, key=lambda p: p["ip"])
+                "is_self": ip == MY_IP,
+            }
+        peers = sorted(by_ip.values(), key=lambda p: p["ip"])
     except socket.gaierror:
-        return []
+        peers = []
+    _dns_cache["value"] = peers
+    _dns_cache["expires"] = time.monotonic() + DNS_CACHE_TTL
+    return peers
+
+
+def _pod_to_peer(pod):
+    """Convert a raw pod JSON dict into the peer dict rendered by render_peer_table."""
+    status = pod.get("status", {})
+    pod_ip = status.get("podIP") or "pending"
+    ready = False
+    for cond in status.get("conditions") or ():
+        if cond["type"] == "Ready" and cond["status"] == "True":
+            ready = True
+    # Fast path for the usual single-container pod — no generator needed
+    css = status.get("containerStatuses")
+    if not css:
+        restarts = 0
+    elif len(css) == 1:
+        restarts = css[0]["restartCount"]
+    else:
+        restarts = sum(cs["restartCount"] for cs in css)
+    return {
+        "name": pod["metadata"]["name"],
+        "ip": pod_ip,
+        "node": pod.get("spec", {}).get("nodeName") or "unknown",
+        "phase": status.get("phase"),
+        "ready": ready,
+        "restarts": restarts,
+        "is_self": pod_ip == MY_IP,
+    }
+
+
+async def _list_peer_pods():
+    """LIST pods once to (re)build _peer_state. Returns the list's resourceVersion."""
+    # _preload_content=False hands back the raw HTTP response, so we parse the
+    # JSON ourselves and skip building a V1Pod model tree for every pod.
+    # resource_version="0" lets the API server answer from its watch cache
+    # instead of doing a quorum read against etcd (the watch catches us up).
+    resp = await k8s_v1.list_namespaced_pod(
+        namespace=NAMESPACE,
+        label_selector=PEER_LABEL_SELECTOR,
+        field_selector=PEER_FIELD_SELECTOR,
+        resource_version="0",
+        _preload_content=False,
+        _request_timeout=5,
+    )
+    body = await resp.read()
+    # The raw path skips the client's own non-2xx check (e.g. 403 without RBAC)
+    if not 200 <= resp.status < 300:
+        raise ApiException(status=resp.status, reason=resp.reason)
+    pods = orjson.loads(body)
+    _peer_state.clear()
+    for pod in pods["items"]:
+        _peer_state[pod["metadata"]["name"]] = _pod_to_peer(pod)
+    return pods["metadata"]["resourceVersion"]
+
+
+async def _watch_peer_pods():
+    """
+    Background task: keep _peer_state in sync with a long-lived pod watch.
+    API-server load becomes O(pod changes) instead of O(requests × pods).
+    The watch resumes from the last seen resourceVersion; bookmarks keep that
+    version current while pods are idle. On 410 Gone (the version has been
+    compacted away) it falls back to a fresh LIST.
+    """
+    global _peer_state_synced
+    resource_version = None
+    while True:
+        try:
+            if resource_version is None:
+                resource_version = await _list_peer_pods()
+                _peer_state_synced = True
+            # return_type="object" keeps events as raw dicts: no V1Pod tree per
+            # event, and BOOKMARK events (which carry only metadata) parse cleanly.
+            # The client-side timeout sits well past the server's timeout_seconds
+            # so the server closing the stream is what normally ends a watch.
+            try:
+                async with watch.Watch(return_type="object").stream(
+                    k8s_v1.list_namespaced_pod,
+                    namespace=NAMESPACE,
+                    label_selector=PEER_LABEL_SELECTOR,
+                    field_selector=PEER_FIELD_SELECTOR,
+                    resource_version=resource_version,
+                    allow_watch_bookmarks=True,
+                    timeout_seconds=PEER_WATCH_TIMEOUT,
+                    _request_timeout=PEER_WATCH_TIMEOUT + 30,
+                ) as stream:
+                    async for event in stream:
+                        pod = event["raw_object"]
+                        resource_version = pod["metadata"]["resourceVersion"]
+                        if event["type"] == "BOOKMARK":
+                            continue
+                        if event["type"] == "DELETED":
+                            _peer_state.pop(pod["metadata"]["name"], None)
+                        else:
+                            _peer_state[pod["metadata"]["name"]] = _pod_to_peer(pod)
+            except asyncio.TimeoutError:
+                # Client-side deadline hit mid-watch — just resume from resource_version
+                logger.info("Peer watch timed out client-side — reconnecting")
+        except ApiException as e:
+            if e.status == 410:
+                logger.info("Peer watch expired (410 Gone) — re-listing pods")
+                resource_version = None
+                continue
+            logger.warning(f"K8s API peer watch failed: {e.status} {e.reason} — retrying in 5s")
+            _peer_state_synced = False
+            resource_version = None
+            await asyncio.sleep(5)
+        except Exception as e:
+            logger.warning(f"K8s API peer watch failed: {e} — retrying in 5s")
+            _peer_state_synced = False
+            resource_version = None
+            await asyncio.sleep(5)
 
 
 def _discover_via_k8s_api():
     """
-    Query the Kubernetes API for all pods in this Deployment (blocking).
+    Return the watched pod snapshot — no I/O, just a sorted copy of _peer_state.
     Returns richer data (pod names, node, restarts) but requires API server access.
     """
-    if not K8S_AVAILABLE:
-        return []
-    try:
-        pods = k8s_v1.list_namespaced_pod(
-            namespace=NAMESPACE,
-            label_selector="app=demo",
-            _request_timeout=2,
-        )
-        my_ip = socket.gethostbyname(socket.gethostname())
-        peers = []
-        for pod in pods.items:
-            pod_ip = pod.status.pod_ip or "pending"
-            ready = False
-            if pod.status.conditions:
-                for cond in pod.status.conditions:
-                    if cond.type == "Ready" and cond.status == "True":
-                        ready = True
-            peers.append({
-                "name": pod.metadata.name,
-                "ip": pod_ip,
-                "node": pod.spec.node_name or "unknown",
-                "phase": pod.status.phase,
-                "ready": ready,
-                "restarts": sum(
-                    cs.restart_count for cs in (pod.status.container_statuses or [])
-                ),
-                "is_self": pod_ip == my_ip,
-            })
-        return sorted(peers, key=lambda p: p["name"])
-    except Exception as e:
-        logger.warning(f"K8s API peer discovery failed: {e}")
+    if not (K8S_AVAILABLE and _peer_state_synced):
         return []
+    return sorted(_peer_state.values(), key=lambda p: p["name"])
 
 
-def _fetch_peer_pods():
+async def _fetch_peer_pods():
     """Try K8s API first (richer data), fall back to DNS discovery."""
     peers = _discover_via_k8s_api()
-    if peers:
+    if peers or not HEADLESS_SVC:
         return peers
-    return _discover_via_dns()
+    return await _discover_via_dns()
+
+
+def _peer_cache_fresh():
+    """True while the cached peer list is within its TTL."""
+    ttl = PEER_CACHE_TTL if _peer_cache["data"] else PEER_CACHE_NEGATIVE_TTL
+    return time.monotonic() - _peer_cache["ts"] < ttl
 
 
 async def get_peer_pods():
-    """Async wrapper — runs discovery in a thread with a timeout."""
-    try:
-        loop = asyncio.get_event_loop()
-        return await asyncio.wait_for(
-            loop.run_in_executor(_k8s_executor, _fetch_peer_pods),
-            timeout=3.0,
-        )
-    except (asyncio.TimeoutError, Exception) as e:
-        logger.warning(f"Peer discovery timed out or failed: {e}")
-        return []
+    """Serve cached peers, or run discovery with a timeout."""
+    if not K8S_AVAILABLE and not HEADLESS_SVC:
+        return []  # no discovery method configured
+    if _peer_cache_fresh():
+        return _peer_cache["data"]
+    async with _peer_lock:
+        # Another request may have refreshed the cache while we waited
+        if _peer_cache_fresh():
+            return _peer_cache["data"]
+        try:
+            peers = await asyncio.wait_for(_fetch_peer_pods(), timeout=3.0)
+        except asyncio.TimeoutError:
+            logger.warning("Peer discovery timed out")
+            peers = []
+        if peers != _peer_cache["data"]:
+            _peer_cache["version"] += 1
+        _peer_cache["data"] = peers
+        _peer_cache["ts"] = time.monotonic()
+        return peers
 
 
-def render_peer_table(peers):
-    """Render the peer pods table HTML with links to each pod's endpoints."""
-    if not peers:
-        return """
+# The table shell is static — only the replica count and the rows vary
+_PEER_TABLE_EMPTY = """
 <div class="card">
   <h2>🔗 Peer Pods</h2>
   <p><em>Peer discovery unavailable — RBAC or Kubernetes client not configured.</em></p>
@@ -163,45 +347,67 @@ def render_peer_table(peers):
 # Apply RBAC to enable peer discovery:
 kubectl apply -f k8s/rbac.yaml
   </pre>
-</div>"""
-
-    rows = ""
-    for p in peers:
-        badge = " <span class='tag'>← YOU</span>" if p["is_self"] else ""
-        ready_icon = "<span class='ok'>✓</span>" if p["ready"] else "<span class='fail'>✗</span>"
-        # Links to this pod's endpoints via direct pod IP (cluster-internal)
-        links = (
-            f'<a href="http://{p["ip"]}:8000/">home</a> · '
-            f'<a href="http://{p["ip"]}:8000/info">info</a> · '
-            f'<a href="http://{p["ip"]}:8000/healthz">healthz</a> · '
-            f'<a href="http://{p["ip"]}:8000/ready">ready</a> · '
-            f'<a href="http://{p["ip"]}:8000/toggle-health">toggle-health</a> · '
-            f'<a href="http://{p["ip"]}:8000/toggle-ready">toggle-ready</a>'
-        )
-        rows += f"""<tr>
-  <td><code>{p["name"]}</code>{badge}</td>
-  <td><code>{p["ip"]}</code></td>
-  <td><code>{p["node"]}</code></td>
-  <td>{ready_icon} {p["phase"]}</td>
-  <td>{p["restarts"]}</td>
-  <td style="font-size:0.85em">{links}</td>
-</tr>"""
-
-    return f"""
+</div>""".encode()
+_PEER_TABLE_HEAD = """
 <div class="card">
-  <h2>🔗 Peer Pods ({len(peers)} replicas)</h2>
+  <h2>🔗 Peer Pods (""".encode()
+_PEER_TABLE_COLUMNS = """ replicas)</h2>
   <p>Live data from the Kubernetes API — each pod discovers its siblings via a ServiceAccount
      with RBAC read access to Endpoints and Pods.</p>
   <table>
     <tr><th>Pod Name</th><th>IP</th><th>Node</th><th>Status</th><th>Restarts</th><th>Endpoints</th></tr>
-    {rows}
+    """.encode()
+_PEER_TABLE_TAIL = f"""
   </table>
   <p style="font-size:0.85em; color:#8b949e">
     ⚠️ Pod-IP links only work from <strong>inside the cluster</strong> (or via port-forward to
     a specific pod). From your local terminal, use:
     <code>kubectl port-forward pod/&lt;name&gt; -n {NAMESPACE} 8080:8000</code>
   </p>
-</div>"""
+</div>""".encode()
+
+# One table row per peer; the format string is parsed once and reused via
+# the bound format_map. Links go to the pod's IP directly (cluster-internal).
+_PEER_ROW_FMT = """<tr>
+  <td><code>{name}</code>{badge}</td>
+  <td><code>{ip}</code></td>
+  <td><code>{node}</code></td>
+  <td>{ready_icon} {phase}</td>
+  <td>{restarts}</td>
+  <td style="font-size:0.85em">\
+<a href="http://{ip}:8000/">home</a> · \
+<a href="http://{ip}:8000/info">info</a> · \
+<a href="http://{ip}:8000/healthz">healthz</a> · \
+<a href="http://{ip}:8000/ready">ready</a> · \
+<a href="http://{ip}:8000/toggle-health">toggle-health</a> · \
+<a href="http://{ip}:8000/toggle-ready">toggle-ready</a></td>
+</tr>""".format_map
+_SELF_BADGE = " <span class='tag'>← YOU</span>"
+_READY_ICON = "<span class='ok'>✓</span>"
+_NOT_READY_ICON = "<span class='fail'>✗</span>"
+
+
+def render_peer_table(peers):
+    """Render the peer pods table HTML (as bytes) with links to each pod's endpoints."""
+    if not peers:
+        return _PEER_TABLE_EMPTY
+
+    parts = []
+    for p in peers:
+        parts.append(_PEER_ROW_FMT({
+            "name": html.escape(p["name"]),
+            "badge": _SELF_BADGE if p["is_self"] else "",
+            "ip": html.escape(p["ip"]),
+            "node": html.escape(p["node"]),
+            "ready_icon": _READY_ICON if p["ready"] else _NOT_READY_ICON,
+            "phase": html.escape(str(p["phase"])),
+            "restarts": p["restarts"],
+        }))
+
+    return b"".join([
+        _PEER_TABLE_HEAD, str(len(peers)).encode(), _PEER_TABLE_COLUMNS,
+        "".join(parts).encode(), _PEER_TABLE_TAIL,
+    ])
 
 
 # ---------------------------------------------------------------------------
@@ -230,36 +436,68 @@ STYLE = """
 
 
 # ---------------------------------------------------------------------------
-# PROBE ENDPOINTS — These are what Kubernetes calls
+# HTTP caching — cheap 304s for browser refreshes and curl loops
 # ---------------------------------------------------------------------------
+# Probe endpoints must always be fresh, so they get no-store. Pages that
+# only change with app state get a short max-age plus an ETag.
+NO_STORE_HEADERS = {"Cache-Control": "no-store"}
+CACHE_MAX_AGE = "max-age=1"
 
-@app.get("/healthz", response_class=HTMLResponse, tags=["probes"])
-async def liveness():
-    """
-    LIVENESS PROBE — /healthz
-    ─────────────────────────
-    Kubernetes calls this to ask: "Is the container still alive?"
-    If this returns non-200, K8s kills and restarts the container.
 
-    From your local terminal (after port-forwarding):
-      kubectl port-forward pod/<pod> -n <namespace> 8080:8000
-      curl -s localhost:8080/healthz
+# Wall-clock time at import differs for every container start, so tags from a
+# previous run of this pod (same POD_NAME, reset counters) never match.
+_PROCESS_KEY = time.time_ns()
+
+
+def make_etag(*state):
+    """Weak ETag over this process's identity and the given state values.
+
+    Weak because pages may differ in small ways (e.g. sub-second uptime)
+    under the same tag.
     """
-    if not HEALTHY:
-        return HTMLResponse(
-            content=f"{STYLE}<h1 class='fail'>UNHEALTHY</h1>"
-                    f"<p>Pod <code>{POD_NAME}</code> is reporting unhealthy. "
-                    f"Kubernetes will restart this container.</p>",
-            status_code=503,
-        )
-    uptime = round(time.time() - APP_START_TIME, 1)
-    return HTMLResponse(content=f"""
+    digest = hashlib.blake2b(
+        repr((POD_NAME, _PROCESS_KEY) + state).encode(), digest_size=8,
+    )
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _opaque_tag(tag):
+    """Strip the weak prefix — If-None-Match uses weak comparison."""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def cached_response(request, etag, render, status_code=200):
+    """Return 304 if the client already holds etag, else render() with caching headers."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_MAX_AGE}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        ours = _opaque_tag(etag)
+        tags = [t.strip() for t in if_none_match.split(",")]
+        # "*" matches any current representation (RFC 9110 §13.1.2)
+        if "*" in tags or any(_opaque_tag(t) == ours for t in tags):
+            return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=render(), status_code=status_code, headers=headers)
+
+
+# ---------------------------------------------------------------------------
+# PROBE ENDPOINTS — These are what Kubernetes calls
+# ---------------------------------------------------------------------------
+
+# Page chrome is rendered once at import; handlers only format what changes
+_LIVENESS_UNHEALTHY = (
+    f"{STYLE}<h1 class='fail'>UNHEALTHY</h1>"
+    f"<p>Pod <code>{POD_NAME}</code> is reporting unhealthy. "
+    f"Kubernetes will restart this container.</p>"
+).encode()
+_LIVENESS_PREFIX = f"""
 {STYLE}
 <h1>🟢 Liveness Probe — <code>/healthz</code></h1>
 <div class="card">
   <h2>Status: <span class="ok">HEALTHY</span></h2>
   <p><strong>Pod:</strong> <code>{POD_NAME}</code></p>
-  <p><strong>Uptime:</strong> {uptime}s</p>
+  <p><strong>Uptime:</strong> """.encode()
+_LIVENESS_SUFFIX = f"""s</p>
 </div>
 <div class="card">
   <h2>📖 How This Works</h2>
@@ -281,34 +519,41 @@ kubectl describe pod {POD_NAME} -n {NAMESPACE} | grep -A5 Events
 kubectl get pods -n {NAMESPACE} -w
   </pre>
 </div>
-""")
+""".encode()
 
 
-@app.get("/ready", response_class=HTMLResponse, tags=["probes"])
-async def readiness():
+@app.get("/healthz", response_class=HTMLResponse, tags=["probes"])
+async def liveness():
     """
-    READINESS PROBE — /ready
-    ────────────────────────
-    Kubernetes calls this to ask: "Should I send traffic to this pod?"
-    If this returns non-200, the pod is removed from Service endpoints.
-    The pod is NOT restarted.
+    LIVENESS PROBE — /healthz
+    ─────────────────────────
+    Kubernetes calls this to ask: "Is the container still alive?"
+    If this returns non-200, K8s kills and restarts the container.
 
     From your local terminal (after port-forwarding):
       kubectl port-forward pod/<pod> -n <namespace> 8080:8000
-      curl -s localhost:8080/ready
+      curl -s localhost:8080/healthz
     """
-    global READY
-    elapsed = time.time() - APP_START_TIME
-    if elapsed < STARTUP_DELAY:
-        remaining = round(STARTUP_DELAY - elapsed, 1)
+    if not HEALTHY:
         return HTMLResponse(
-            content=f"{STYLE}<h1>⏳ Not Ready Yet</h1>"
-                    f"<p>Simulating startup delay... {remaining}s remaining</p>"
-                    f"<p>Pod <code>{POD_NAME}</code> will NOT receive traffic until ready.</p>",
-            status_code=503,
+            content=_LIVENESS_UNHEALTHY, status_code=503, headers=NO_STORE_HEADERS,
         )
-    READY = True
-    return HTMLResponse(content=f"""
+    uptime = round(time.monotonic() - APP_START_MONO, 1)
+    return HTMLResponse(
+        content=b"".join([_LIVENESS_PREFIX, str(uptime).encode(), _LIVENESS_SUFFIX]),
+        headers=NO_STORE_HEADERS,
+    )
+
+
+_READY_PENDING_PREFIX = (
+    f"{STYLE}<h1>⏳ Not Ready Yet</h1>"
+    "<p>Simulating startup delay... "
+).encode()
+_READY_PENDING_SUFFIX = (
+    "s remaining</p>"
+    f"<p>Pod <code>{POD_NAME}</code> will NOT receive traffic until ready.</p>"
+).encode()
+_READY_BODY = f"""
 {STYLE}
 <h1>🟢 Readiness Probe — <code>/ready</code></h1>
 <div class="card">
@@ -337,24 +582,38 @@ curl -s localhost:8080/ready
 kubectl get pods -n {NAMESPACE} -o wide
   </pre>
 </div>
-""")
+""".encode()
 
 
-@app.get("/startup", response_class=HTMLResponse, tags=["probes"])
-async def startup():
+@app.get("/ready", response_class=HTMLResponse, tags=["probes"])
+async def readiness():
     """
-    STARTUP PROBE — /startup
+    READINESS PROBE — /ready
     ────────────────────────
-    Called only during container startup. While failing, liveness and
-    readiness probes are disabled. Once it passes, it never runs again.
+    Kubernetes calls this to ask: "Should I send traffic to this pod?"
+    If this returns non-200, the pod is removed from Service endpoints.
+    The pod is NOT restarted.
+
+    From your local terminal (after port-forwarding):
+      kubectl port-forward pod/<pod> -n <namespace> 8080:8000
+      curl -s localhost:8080/ready
     """
-    elapsed = time.time() - APP_START_TIME
-    if elapsed < 2:  # simulate 2s init
+    if not _startup_done.is_set():
+        elapsed = time.monotonic() - APP_START_MONO
+        remaining = round(max(STARTUP_DELAY - elapsed, 0), 1)
         return HTMLResponse(
-            content=f"{STYLE}<h1>⏳ Starting up...</h1><p>{round(2 - elapsed, 1)}s remaining</p>",
+            content=b"".join([
+                _READY_PENDING_PREFIX, str(remaining).encode(), _READY_PENDING_SUFFIX,
+            ]),
             status_code=503,
+            headers=NO_STORE_HEADERS,
         )
-    return HTMLResponse(content=f"""
+    return HTMLResponse(content=_READY_BODY, headers=NO_STORE_HEADERS)
+
+
+_STARTUP_PENDING_PREFIX = f"{STYLE}<h1>⏳ Starting up...</h1><p>".encode()
+_STARTUP_PENDING_SUFFIX = b"s remaining</p>"
+_STARTUP_BODY = f"""
 {STYLE}
 <h1>🟢 Startup Probe — <code>/startup</code></h1>
 <div class="card">
@@ -370,20 +629,36 @@ async def startup():
      <code>initialDelaySeconds + (failureThreshold × periodSeconds)</code></p>
   <p>Once it passes once, it <strong>never runs again</strong> for the lifetime of the container.</p>
 </div>
-""")
+""".encode()
+_STARTUP_ETAG = make_etag("startup")
+
+
+@app.get("/startup", response_class=HTMLResponse, tags=["probes"])
+async def startup(request: Request):
+    """
+    STARTUP PROBE — /startup
+    ────────────────────────
+    Called only during container startup. While failing, liveness and
+    readiness probes are disabled. Once it passes, it never runs again.
+    """
+    elapsed = time.monotonic() - APP_START_MONO
+    if elapsed < 2:  # simulate 2s init
+        return HTMLResponse(
+            content=b"".join([
+                _STARTUP_PENDING_PREFIX, str(round(2 - elapsed, 1)).encode(),
+                _STARTUP_PENDING_SUFFIX,
+            ]),
+            status_code=503,
+            headers=NO_STORE_HEADERS,
+        )
+    return cached_response(request, _STARTUP_ETAG, lambda: _STARTUP_BODY)
 
 
 # ---------------------------------------------------------------------------
 # OPERATIONAL / DEMO ENDPOINTS
 # ---------------------------------------------------------------------------
 
-@app.get("/", response_class=HTMLResponse, tags=["info"])
-async def index():
-    """Landing page with navigation and educational overview."""
-    uptime = round(time.time() - APP_START_TIME, 1)
-    peers = await get_peer_pods()
-    peer_html = render_peer_table(peers)
-    return HTMLResponse(content=f"""
+_INDEX_PREFIX = f"""
 {STYLE}
 <h1>🚀 EKS Probe Demo — FastAPI</h1>
 <div class="card">
@@ -391,12 +666,14 @@ async def index():
   <p><strong>Node:</strong> <code>{NODE_NAME}</code></p>
   <p><strong>Namespace:</strong> <code>{NAMESPACE}</code></p>
   <p><strong>Version:</strong> <code>{APP_VERSION}</code></p>
-  <p><strong>Uptime:</strong> {uptime}s</p>
-  <p><strong>Hostname:</strong> <code>{socket.gethostname()}</code></p>
-  <p><strong>IP:</strong> <code>{socket.gethostbyname(socket.gethostname())}</code></p>
+  <p><strong>Uptime:</strong> """.encode()
+_INDEX_MIDDLE = f"""s</p>
+  <p><strong>Hostname:</strong> <code>{MY_HOSTNAME}</code></p>
+  <p><strong>IP:</strong> <code>{MY_IP}</code></p>
 </div>
 
-{peer_html}
+""".encode()
+_INDEX_SUFFIX = f"""
 
 <h2>📡 Probe Endpoints</h2>
 <table>
@@ -447,23 +724,23 @@ kubectl exec -it {POD_NAME} -n {NAMESPACE} -- /bin/sh
 # Port-forward to access locally
 kubectl port-forward pod/{POD_NAME} -n {NAMESPACE} 8080:8000
 </pre>
-""")
+""".encode()
 
 
-@app.get("/info", response_class=HTMLResponse, tags=["info"])
-async def info():
-    """Detailed pod metadata and environment information."""
-    uptime = round(time.time() - APP_START_TIME, 1)
+@app.get("/", response_class=HTMLResponse, tags=["info"])
+async def index(request: Request):
+    """Landing page with navigation and educational overview."""
+    uptime = round(time.monotonic() - APP_START_MONO, 1)
     peers = await get_peer_pods()
-    peer_html = render_peer_table(peers)
-    env_rows = ""
-    for key in sorted(os.environ):
-        if any(s in key.upper() for s in ["SECRET", "PASSWORD", "TOKEN", "KEY"]):
-            env_rows += f"<tr><td><code>{key}</code></td><td>••••••••</td></tr>"
-        else:
-            env_rows += f"<tr><td><code>{key}</code></td><td><code>{os.environ[key][:100]}</code></td></tr>"
+    # Uptime is bucketed to whole seconds so a 304 is never more than ~1s stale
+    etag = make_etag("index", HEALTHY, READY, _peer_cache["version"], int(uptime))
+    return cached_response(request, etag, lambda: b"".join([
+        _INDEX_PREFIX, str(uptime).encode(), _INDEX_MIDDLE,
+        render_peer_table(peers), _INDEX_SUFFIX,
+    ]))
+
 
-    return HTMLResponse(content=f"""
+_INFO_PREFIX = f"""
 {STYLE}
 <h1>📋 Pod Info — <code>{POD_NAME}</code></h1>
 <div class="card">
@@ -472,13 +749,17 @@ async def info():
     <tr><td><strong>Pod Name</strong></td><td><code>{POD_NAME}</code></td></tr>
     <tr><td><strong>Namespace</strong></td><td><code>{NAMESPACE}</code></td></tr>
     <tr><td><strong>Node</strong></td><td><code>{NODE_NAME}</code></td></tr>
-    <tr><td><strong>Hostname</strong></td><td><code>{socket.gethostname()}</code></td></tr>
-    <tr><td><strong>IP Address</strong></td><td><code>{socket.gethostbyname(socket.gethostname())}</code></td></tr>
-    <tr><td><strong>Uptime</strong></td><td>{uptime}s</td></tr>
-    <tr><td><strong>Healthy</strong></td><td>{"<span class='ok'>Yes</span>" if HEALTHY else "<span class='fail'>No</span>"}</td></tr>
-    <tr><td><strong>Ready</strong></td><td>{"<span class='ok'>Yes</span>" if READY else "<span class='fail'>No</span>"}</td></tr>
+    <tr><td><strong>Hostname</strong></td><td><code>{MY_HOSTNAME}</code></td></tr>
+    <tr><td><strong>IP Address</strong></td><td><code>{MY_IP}</code></td></tr>
+    <tr><td><strong>Uptime</strong></td><td>""".encode()
+_INFO_HEALTHY = """s</td></tr>
+    <tr><td><strong>Healthy</strong></td><td>""".encode()
+_INFO_READY = """</td></tr>
+    <tr><td><strong>Ready</strong></td><td>""".encode()
+_INFO_TIME = f"""</td></tr>
     <tr><td><strong>Version</strong></td><td><code>{APP_VERSION}</code></td></tr>
-    <tr><td><strong>Time</strong></td><td>{datetime.datetime.now(datetime.timezone.utc).isoformat()}</td></tr>
+    <tr><td><strong>Time</strong></td><td>""".encode()
+_INFO_PEERS = f"""</td></tr>
   </table>
 </div>
 <div class="card">
@@ -494,30 +775,60 @@ for i in $(seq 1 5); do
 done
   </pre>
 </div>
-{peer_html}
+""".encode()
+_INFO_ENV = """
 <div class="card">
   <h2>Environment Variables</h2>
   <table>
     <tr><th>Variable</th><th>Value</th></tr>
-    {env_rows}
+    """.encode()
+_INFO_SUFFIX = """
   </table>
 </div>
-""")
+""".encode()
 
 
-@app.get("/toggle-health", response_class=HTMLResponse, tags=["chaos"])
-async def toggle_health():
-    """
-    TOGGLE LIVENESS — /toggle-health
-    ─────────────────────────────────
-    Flips the health status. When unhealthy, /healthz returns 503
-    and Kubernetes will restart the container after failureThreshold.
-    """
-    global HEALTHY
-    HEALTHY = not HEALTHY
-    status = "HEALTHY" if HEALTHY else "UNHEALTHY"
-    css_class = "ok" if HEALTHY else "fail"
-    return HTMLResponse(content=f"""
+def _render_env_rows():
+    """Render the env var table rows, masking anything that looks like a secret."""
+    rows = []
+    for key in sorted(os.environ):
+        if any(s in key.upper() for s in ["SECRET", "PASSWORD", "TOKEN", "KEY"]):
+            rows.append(f"<tr><td><code>{html.escape(key)}</code></td><td>••••••••</td></tr>")
+        else:
+            rows.append(f"<tr><td><code>{html.escape(key)}</code></td>"
+                        f"<td><code>{html.escape(os.environ[key][:100])}</code></td></tr>")
+    return "".join(rows).encode()
+
+
+# A pod's environment is fixed for its lifetime — render the table once
+ENV_ROWS_HTML = _render_env_rows()
+_YES = "<span class='ok'>Yes</span>".encode()
+_NO = "<span class='fail'>No</span>".encode()
+
+
+@app.get("/info", response_class=HTMLResponse, tags=["info"])
+async def info():
+    """Detailed pod metadata and environment information."""
+    uptime = round(time.monotonic() - APP_START_MONO, 1)
+    peers = await get_peer_pods()
+    peer_html = render_peer_table(peers)
+
+    return HTMLResponse(content=b"".join([
+        _INFO_PREFIX, str(uptime).encode(),
+        _INFO_HEALTHY, _YES if HEALTHY else _NO,
+        _INFO_READY, _YES if READY else _NO,
+        _INFO_TIME, datetime.datetime.now(datetime.timezone.utc).isoformat().encode(),
+        _INFO_PEERS, peer_html,
+        _INFO_ENV, ENV_ROWS_HTML,
+        _INFO_SUFFIX,
+    ]))
+
+
+def _render_toggle_health(healthy):
+    """Render the /toggle-health result page for one HEALTHY state."""
+    status = "HEALTHY" if healthy else "UNHEALTHY"
+    css_class = "ok" if healthy else "fail"
+    return f"""
 {STYLE}
 <h1>⚡ Health Toggled</h1>
 <div class="card">
@@ -525,7 +836,7 @@ async def toggle_health():
   <p><strong>Pod:</strong> <code>{POD_NAME}</code></p>
   {"<p>⚠️ The liveness probe at <code>/healthz</code> will now return <strong>503</strong>. "
    "Kubernetes will restart this container after <code>failureThreshold</code> consecutive failures.</p>"
-   if not HEALTHY else
+   if not healthy else
    "<p>✅ The liveness probe is passing again.</p>"}
 </div>
 <div class="card">
@@ -574,22 +885,31 @@ kubectl describe pod {POD_NAME} -n {NAMESPACE} | tail -20
   </pre>
 </div>
 <p><a href="/toggle-health">Toggle again</a> | <a href="/">Home</a></p>
-""")
+""".encode()
 
 
-@app.get("/toggle-ready", response_class=HTMLResponse, tags=["chaos"])
-async def toggle_ready():
+# Only two possible pages — render both up front
+_TOGGLE_HEALTH_PAGES = {state: _render_toggle_health(state) for state in (True, False)}
+
+
+@app.get("/toggle-health", response_class=HTMLResponse, tags=["chaos"])
+async def toggle_health():
     """
-    TOGGLE READINESS — /toggle-ready
+    TOGGLE LIVENESS — /toggle-health
     ─────────────────────────────────
-    Flips readiness. When not ready, /ready returns 503 and the pod
-    is removed from Service endpoints — no traffic is routed to it.
+    Flips the health status. When unhealthy, /healthz returns 503
+    and Kubernetes will restart the container after failureThreshold.
     """
-    global READY
-    READY = not READY
-    status = "READY" if READY else "NOT READY"
-    css_class = "ok" if READY else "fail"
-    return HTMLResponse(content=f"""
+    global HEALTHY
+    HEALTHY = not HEALTHY
+    return HTMLResponse(content=_TOGGLE_HEALTH_PAGES[HEALTHY])
+
+
+def _render_toggle_ready(ready):
+    """Render the /toggle-ready result page for one READY state."""
+    status = "READY" if ready else "NOT READY"
+    css_class = "ok" if ready else "fail"
+    return f"""
 {STYLE}
 <h1>⚡ Readiness Toggled</h1>
 <div class="card">
@@ -598,7 +918,7 @@ async def toggle_ready():
   {"<p>⚠️ The readiness probe at <code>/ready</code> will now return <strong>503</strong>. "
    "This pod will be <strong>removed from the Service endpoints</strong> — no traffic routed here. "
    "The pod is NOT restarted.</p>"
-   if not READY else
+   if not ready else
    "<p>✅ The pod is ready and will receive traffic again.</p>"}
 </div>
 <div class="card">
@@ -661,30 +981,55 @@ kubectl describe pod {POD_NAME} -n {NAMESPACE} | tail -20
   </pre>
 </div>
 <p><a href="/toggle-ready">Toggle again</a> | <a href="/">Home</a></p>
-""")
+""".encode()
 
 
-@app.get("/stress", response_class=HTMLResponse, tags=["chaos"])
-async def stress():
+# Only two possible pages — render both up front
+_TOGGLE_READY_PAGES = {state: _render_toggle_ready(state) for state in (True, False)}
+
+
+@app.get("/toggle-ready", response_class=HTMLResponse, tags=["chaos"])
+async def toggle_ready():
     """
-    STRESS ENDPOINT — /stress
-    ─────────────────────────
-    Burns CPU for ~2 seconds. Use this to demo resource monitoring,
-    HPA scaling, and kubectl top.
+    TOGGLE READINESS — /toggle-ready
+    ─────────────────────────────────
+    Flips readiness. When not ready, /ready returns 503 and the pod
+    is removed from Service endpoints — no traffic is routed to it.
     """
-    start = time.time()
-    # Simple CPU burn — ~2 seconds of computation
-    x = 0
-    while time.time() - start < 2:
-        x += sum(i * i for i in range(1000))
-    elapsed = round(time.time() - start, 2)
-
-    return HTMLResponse(content=f"""
+    global READY
+    READY = not READY
+    return HTMLResponse(content=_TOGGLE_READY_PAGES[READY])
+
+
+# CPU burn runs in worker threads so the event loop (and /healthz) stays
+# responsive. hashlib releases the GIL on large buffers, so the threads
+# really do burn CPU in C rather than in Python bytecode. At most
+# STRESS_CONCURRENCY burns run at once (minimum 1); extra callers get a 429.
+STRESS_CONCURRENCY = max(1, int(os.getenv("STRESS_CONCURRENCY", "2")))
+_stress_sem = asyncio.Semaphore(STRESS_CONCURRENCY)
+_stress_executor = ThreadPoolExecutor(max_workers=STRESS_CONCURRENCY)
+_BURN_BLOCK = b"\0" * 4096
+
+
+def _burn(duration_ns):
+    """Hash a fixed buffer in a tight loop for duration_ns nanoseconds (blocking)."""
+    deadline = time.monotonic_ns() + duration_ns
+    while time.monotonic_ns() < deadline:
+        hashlib.sha256(_BURN_BLOCK).digest()
+
+
+_STRESS_BUSY = (
+    f"{STYLE}<h1 class='fail'>🔥 Stress Busy</h1>"
+    f"<p>Pod <code>{POD_NAME}</code> is already running {STRESS_CONCURRENCY} stress burns. "
+    f"Try again in a couple of seconds.</p>"
+).encode()
+_STRESS_PREFIX = f"""
 {STYLE}
 <h1>🔥 Stress Test Complete</h1>
 <div class="card">
   <p><strong>Pod:</strong> <code>{POD_NAME}</code></p>
-  <p><strong>Duration:</strong> {elapsed}s of CPU burn</p>
+  <p><strong>Duration:</strong> """.encode()
+_STRESS_SUFFIX = f"""s of CPU burn</p>
 </div>
 <div class="card">
   <h2>📖 Why This Exists</h2>
@@ -699,4 +1044,27 @@ kubectl get hpa -n {NAMESPACE}
   </pre>
 </div>
 <p><a href="/stress">Run again</a> | <a href="/">Home</a></p>
-""")
+""".encode()
+
+
+@app.get("/stress", response_class=HTMLResponse, tags=["chaos"])
+async def stress():
+    """
+    STRESS ENDPOINT — /stress
+    ─────────────────────────
+    Burns CPU for ~2 seconds. Use this to demo resource monitoring,
+    HPA scaling, and kubectl top.
+    Returns 429 when STRESS_CONCURRENCY burns are already running.
+    """
+    if _stress_sem.locked():
+        return HTMLResponse(content=_STRESS_BUSY, status_code=429)
+    async with _stress_sem:
+        start = time.monotonic()
+        # ~2 seconds of CPU burn, off the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_stress_executor, _burn, 2_000_000_000)
+        elapsed = round(time.monotonic() - start, 2)
+
+    return HTMLResponse(content=b"".join([
+        _STRESS_PREFIX, str(elapsed).encode(), _STRESS_SUFFIX,
+    ]))